@@ -1,3 +1,5 @@
+import os
+
 import mysql.connector
 
 def get_db_connection():
@@ -20,3 +22,33 @@ def get_db_connection():
     except mysql.connector.Error as err:
         print(f"Error connecting to database: {err}")
         return None
+
+
+def get_db_writer_connection():
+    """
+    Establishes a connection to the primary, for statements the read
+    replica rejects (e.g. the dashboard snapshot DDL). Credentials come
+    from CB_DB_WRITER_HOST / CB_DB_WRITER_USER / CB_DB_WRITER_PASSWORD.
+    """
+    host = os.environ.get("CB_DB_WRITER_HOST")
+    user = os.environ.get("CB_DB_WRITER_USER")
+    if not host or not user:
+        print("Error connecting to database: CB_DB_WRITER_HOST and CB_DB_WRITER_USER must be set.")
+        return None
+    try:
+        conn = mysql.connector.connect(
+            user=user,
+            password=os.environ.get("CB_DB_WRITER_PASSWORD", ""),
+            host=host,
+            port=os.environ.get("CB_DB_WRITER_PORT", "3306"),
+            database='saldogra_gamma',
+            use_pure=True,
+            ssl_disabled=True,
+            charset='utf8mb4'
+        )
+        conn.autocommit = True
+        print("Connected to primary database!")
+        return conn
+    except mysql.connector.Error as err:
+        print(f"Error connecting to database: {err}")
+        return None
@@ -5,18 +5,41 @@ Queries fraud.fought_cbs_followup WHERE rechargeApi = 9 and generates
 a self-contained HTML dashboard inspired by the Kloutit design.
 
 Usage:
-    python generate_dashboard.py
+    python generate_dashboard.py            # render from the snapshot table
+    python generate_dashboard.py --refresh  # rebuild the snapshot first (needs CB_DB_WRITER_*)
+    python generate_dashboard.py --force    # render even if nothing changed
 """
 
+import argparse
+import base64
+import gzip
+import hashlib
 import json
 import os
+import shlex
 import subprocess
 from datetime import datetime
 from decimal import Decimal
 from collections import defaultdict
 
+import numpy as np
 import pandas as pd
-from db_connection import get_db_connection
+from db_connection import get_db_connection, get_db_writer_connection
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: only the .gz copy is written
+    brotli = None
+
+try:
+    import pyarrow
+except ImportError:  # optional: rows are read into default NumPy/object dtypes
+    pyarrow = None
 
 
 # ---------------------------------------------------------------------------
@@ -32,157 +55,335 @@ STATUS_CONFIG = {
     None:                   {"label": "N/A",             "color": "#607D8B", "bg": "#ECEFF1"},
 }
 
+# Casos table badge per mapped status, rendered once at import
+STATUS_BADGE_HTML = {
+    s: f'<span style="background:{cfg["bg"]}; color:{cfg["color"]}; padding:4px 8px; border-radius:4px; font-weight:600; font-size:0.8rem; border:1px solid {cfg["color"]}">{cfg["label"]}</span>'
+    for s, cfg in STATUS_CONFIG.items() if s is not None
+}
+
 STATUS_ORDER = ["Won", "Accepted", "Documents submitted", "Active", "N/A (fought)", "N/A (non-fought)", None]
 
+DATE_COLUMNS = ("payment_date", "chargeback_received_date", "submission_date", "result_date")
+
+# numpy dtype -> JS typed array used to view packed Casos columns
+TYPED_ARRAY_NAMES = {
+    "<f8": "Float64Array",
+    "<i4": "Int32Array",
+    "<u4": "Uint32Array",
+    "<u2": "Uint16Array",
+    "|u1": "Uint8Array",
+}
+
+# Stored as pandas categoricals once loaded
+CATEGORY_COLUMNS = ("operator", "bank", "country", "type", "status", "dashboard_status")
+
+
+# ---------------------------------------------------------------------------
+# Data access
+# ---------------------------------------------------------------------------
+# dashboard_status is derived in SQL rather than in pandas: the Casos table
+# needs every detail row anyway, so the split is free here.
+# The binlist join is filled in by _detail_query(); see BINLIST_JOINS.
+DETAIL_QUERY = """
+SELECT
+cbs.user_id, cbs.amount, cbs.operator, cbs.credit_card, bl.type, bl.standard_bank_name AS bank, bl.country, cbs.payment_date, cbs.chargeback_received_date, IF(fcbs.sift_id IS NOT NULL, 1, 0) AS is_fought, fcbs.status, fcbs.created_at AS submission_date, fcbs.result_date,
+CASE
+    WHEN fcbs.status IS NOT NULL THEN fcbs.status
+    WHEN fcbs.sift_id IS NOT NULL THEN 'N/A (fought)'
+    ELSE 'N/A (non-fought)'
+END AS dashboard_status
+FROM fraud.cb_payments AS cbs
+LEFT JOIN saldogra_gamma.binlist AS bl
+ON {binlist_join}
+LEFT JOIN fraud.fought_cbs_followup AS fcbs
+ON cbs.id = fcbs.payment_id
+WHERE cbs.created_at > CURDATE() - INTERVAL 6 MONTH
+AND cbs.rechargeApi = 9
+"""
+
+# cbs.card_first_6 and its index come from sql/00_indexes.sql. Until that
+# migration has run, the join falls back to LEFT(), which no index can serve.
+BINLIST_JOINS = {
+    True: "cbs.card_first_6 = bl.card_first_6",
+    False: "LEFT(cbs.credit_card, 6) = bl.card_first_6",
+}
+
+
+def _detail_query(conn) -> str:
+    """DETAIL_QUERY with the best binlist join the schema supports."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.columns "
+            "WHERE table_schema = 'fraud' AND table_name = 'cb_payments' AND column_name = 'card_first_6'"
+        )
+        has_card_first_6 = cursor.fetchone()[0] > 0
+    finally:
+        cursor.close()
+    return DETAIL_QUERY.format(binlist_join=BINLIST_JOINS[has_card_first_6])
+
+
+# MySQL has no materialized views, so the join above is materialised into a
+# plain table by refresh_snapshot() (scheduled via --refresh) and renders
+# read that instead of re-running the join every time.
+SNAPSHOT_SCHEMA = "fraud"
+SNAPSHOT_NAME = "cb_dashboard_snapshot"
+SNAPSHOT_TABLE = f"{SNAPSHOT_SCHEMA}.{SNAPSHOT_NAME}"
+
+# Renders fall back to the live join once the snapshot is older than this,
+# so a stalled refresh job cannot freeze the dashboard.
+SNAPSHOT_MAX_AGE_HOURS = 6
+
+
+def _snapshot_state(conn):
+    """
+    Return (refreshed_at, age in seconds) of the snapshot table, or None
+    when it is missing, empty or predates the refresh timestamp column.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.columns "
+            "WHERE table_schema = %s AND table_name = %s AND column_name = 'snapshot_refreshed_at'",
+            (SNAPSHOT_SCHEMA, SNAPSHOT_NAME),
+        )
+        if cursor.fetchone()[0] == 0:
+            return None
+        # Age is computed server-side so client and server clocks never mix
+        cursor.execute(
+            f"SELECT snapshot_refreshed_at, TIMESTAMPDIFF(SECOND, snapshot_refreshed_at, NOW()) "
+            f"FROM {SNAPSHOT_TABLE} LIMIT 1"
+        )
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def _fresh_snapshot(conn, report: bool = True):
+    """Refresh time of the snapshot if renders should read it, else None."""
+    state = _snapshot_state(conn)
+    if state is None:
+        return None
+    refreshed_at, age = state
+    hours = age / 3600
+    if hours > SNAPSHOT_MAX_AGE_HOURS:
+        if report:
+            print(f"      -> WARNING: {SNAPSHOT_TABLE} is {hours:.1f}h old, reading the live tables instead.")
+        return None
+    if report:
+        print(f"      -> Using {SNAPSHOT_TABLE} (refreshed {hours:.1f}h ago).")
+    return refreshed_at
+
+
+def refresh_snapshot():
+    """Rebuild the snapshot table and swap it in atomically."""
+    # DDL needs the primary: the default connection is a read-only replica
+    conn = get_db_writer_connection()
+    if conn is None:
+        raise ConnectionError("Could not connect to the primary database.")
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"DROP TABLE IF EXISTS {SNAPSHOT_TABLE}_new")
+        cursor.execute(
+            f"CREATE TABLE {SNAPSHOT_TABLE}_new AS "
+            f"SELECT NOW() AS snapshot_refreshed_at, d.* FROM ({_detail_query(conn)}) AS d"
+        )
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {SNAPSHOT_TABLE} LIKE {SNAPSHOT_TABLE}_new")
+        # Left behind if an earlier run died between the RENAME and the DROP
+        cursor.execute(f"DROP TABLE IF EXISTS {SNAPSHOT_TABLE}_old")
+        cursor.execute(
+            f"RENAME TABLE {SNAPSHOT_TABLE} TO {SNAPSHOT_TABLE}_old, "
+            f"{SNAPSHOT_TABLE}_new TO {SNAPSHOT_TABLE}"
+        )
+        cursor.execute(f"DROP TABLE {SNAPSHOT_TABLE}_old")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+# Cheap change detector for the live rows behind the dashboard: newest
+# insert/result timestamp, row count and a checksum over every cb_payments
+# and fought_cbs_followup column the render reads. binlist is reference
+# data and is not covered: after editing it, run with --force (or --refresh
+# when rendering from the snapshot).
+FINGERPRINT_QUERY = """
+SELECT
+MAX(GREATEST(cbs.created_at, IFNULL(fcbs.created_at, cbs.created_at), IFNULL(fcbs.result_date, cbs.created_at))),
+COUNT(*),
+COALESCE(SUM(CRC32(CONCAT_WS('|',
+    cbs.user_id, cbs.amount, cbs.operator, IFNULL(cbs.credit_card, ''), IFNULL(cbs.payment_date, ''),
+    IFNULL(cbs.chargeback_received_date, ''), IFNULL(fcbs.sift_id, ''), IFNULL(fcbs.status, ''),
+    IFNULL(fcbs.created_at, ''), IFNULL(fcbs.result_date, '')
+))), 0)
+FROM fraud.cb_payments AS cbs
+LEFT JOIN fraud.fought_cbs_followup AS fcbs
+ON cbs.id = fcbs.payment_id
+WHERE cbs.created_at > CURDATE() - INTERVAL 6 MONTH
+AND cbs.rechargeApi = 9
+"""
+
+
+def fetch_fingerprint() -> str:
+    """
+    Return a fingerprint of the data fetch_data() will render, used to
+    skip no-op runs.
+    """
+    conn = get_db_connection()
+    if conn is None:
+        raise ConnectionError("Could not connect to the database.")
+    cursor = conn.cursor()
+    try:
+        # A snapshot is immutable once built, so its refresh time identifies it
+        refreshed_at = _fresh_snapshot(conn, report=False)
+        if refreshed_at is not None:
+            return f"snapshot|{refreshed_at}"
+        cursor.execute(FINGERPRINT_QUERY)
+        return "|".join(str(v) for v in cursor.fetchone())
+    finally:
+        cursor.close()
+        conn.close()
+
 
 def fetch_data():
-    """Fetch all chargeback records using a single unified query."""
+    """
+    Fetch all chargeback records, from the snapshot table when it is
+    fresh enough and from the live join otherwise.
+    """
     conn = get_db_connection()
     if conn is None:
         raise ConnectionError("Could not connect to the database.")
     try:
-        query = """
-        SELECT
-        cbs.user_id, cbs.amount, cbs.operator, cbs.credit_card, bl.type, bl.standard_bank_name AS bank, bl.country, cbs.payment_date, cbs.chargeback_received_date, IF(fcbs.sift_id IS NOT NULL, 1, 0) AS is_fought, fcbs.status, fcbs.created_at AS submission_date, fcbs.result_date
-        FROM fraud.cb_payments AS cbs
-        LEFT JOIN saldogra_gamma.binlist AS bl
-        ON LEFT(cbs.credit_card,6) = bl.card_first_6
-        LEFT JOIN fraud.fought_cbs_followup AS fcbs
-        ON cbs.id = fcbs.payment_id
-        WHERE cbs.created_at > CURDATE() - INTERVAL 6 MONTH
-        AND cbs.rechargeApi = 9
-        """
-        df = pd.read_sql(query, conn)
+        from_snapshot = _fresh_snapshot(conn) is not None
+        query = f"SELECT * FROM {SNAPSHOT_TABLE}" if from_snapshot else _detail_query(conn)
+        # Arrow-backed columns when pyarrow is installed: numerics stay
+        # contiguous and strings share one buffer instead of becoming
+        # Python objects per cell
+        read_kwargs = {"dtype_backend": "pyarrow"} if pyarrow is not None else {}
+        df = pd.read_sql(query, conn, **read_kwargs)
+        if from_snapshot:
+            df = df.drop(columns="snapshot_refreshed_at")
         return df
     finally:
         conn.close()
 
 
-def process_data(df: pd.DataFrame) -> dict:
+def _metric_rows(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Aggregate the raw dataframe into summary structures
-    consumed by the HTML template.
+    Narrow per-row frame of the masks and group keys the dashboard
+    aggregates on. Built once and shared by the all & fought metrics.
     """
-    # Normalise
-    df["amount"] = df["amount"].astype(float)
-    df["status"] = df["status"].where(df["status"].notna(), None)
-    
-    # Dashboard-specific status split
-    df["dashboard_status"] = df["status"]
-    df.loc[df["status"].isna() & (df["is_fought"] == 1), "dashboard_status"] = "N/A (fought)"
-    df.loc[df["status"].isna() & (df["is_fought"] == 0), "dashboard_status"] = "N/A (non-fought)"
-    
-    # We use submission_date for the month aggregations. 
-    # Use payment_date as fallback if there is no submission_date (unfought cb)
-    df["dashboard_date"] = pd.to_datetime(df["submission_date"])
-    df["dashboard_date"] = df["dashboard_date"].fillna(pd.to_datetime(df["payment_date"]))
-    df["month"] = df["dashboard_date"].dt.to_period("M")
-
-def _aggregate_dashboard_metrics(df: pd.DataFrame) -> dict:
-    """Helper to aggregate all dashboard charts for a given dataframe slice."""
-    total_records = len(df)
-    total_amount = df["amount"].sum()
-
-    won_mask = df["status"] == "Won"
-    lost_mask = df["status"] == "Accepted"
-    fought_mask = df["is_fought"] == 1
-    
-    recovered_amount = df.loc[won_mask, "amount"].sum()
-    lost_amount = df.loc[lost_mask, "amount"].sum()
-    fought_amount = df.loc[fought_mask, "amount"].sum()
+    won = (df["status"] == "Won").to_numpy()
+    amount = df["amount"].to_numpy()
+
+    # e.g 'visa', 'mastercard', 'amex'
+    types_raw = df["type"].str.lower().fillna("desconocido")
+
+    return pd.DataFrame({
+        "amount": amount,
+        "dashboard_status": df["dashboard_status"],
+        "operator": df["operator"],
+        "bank": df["bank"],
+        "won": won,
+        "won_total": np.where(won, amount, 0.0),
+        "lost": (df["status"] == "Accepted").to_numpy(),
+        "fought": (df["is_fought"] == 1).to_numpy(),
+        "month_payment": df["payment_date"].dt.to_period("M"),
+        "month_cb": df["chargeback_received_date"].dt.to_period("M"),
+        # We want to map standard names simply (first match wins)
+        "cc_type": np.select(
+            [
+                types_raw.str.contains("visa", regex=False),
+                types_raw.str.contains("master", regex=False),
+                types_raw.str.contains("amex|american"),
+            ],
+            ["VISA", "MasterCard", "AMEX"],
+            default="Otro",
+        ),
+        "country": df["country"].str.upper().fillna("DESCONOCIDO"),
+    }, index=df.index)
+
+
+def _aggregate_dashboard_metrics(rows: pd.DataFrame) -> dict:
+    """Helper to aggregate all dashboard charts for a _metric_rows() slice."""
+    statuses = STATUS_ORDER[:-1] # exclude raw None
+    amount = rows["amount"].to_numpy()
+    won_mask = rows["won"].to_numpy()
+    lost_mask = rows["lost"].to_numpy()
+    fought_mask = rows["fought"].to_numpy()
+
+    total_records = len(rows)
+    total_amount = amount.sum()
+
+    recovered_amount = amount[won_mask].sum()
+    lost_amount = amount[lost_mask].sum()
+    fought_amount = amount[fought_mask].sum()
     
     won_count = won_mask.sum()
     lost_count = lost_mask.sum()
     fought_count = fought_mask.sum()
     success_rate = (won_count / (won_count + lost_count) * 100) if (won_count + lost_count) else 0
 
-    status_summary = {}
-    for s in STATUS_ORDER[:-1]: # exclude raw None
-        mask = df["dashboard_status"] == s
-        status_summary[s] = {
-            "count": int(mask.sum()),
-            "amount": float(df.loc[mask, "amount"].sum()),
-        }
+    by_status_total = (
+        rows.groupby("dashboard_status", observed=True)["amount"]
+        .agg(["size", "sum"])
+        .reindex(statuses, fill_value=0)
+    )
+    status_summary = {
+        s: {"count": int(by_status_total.at[s, "size"]), "amount": float(by_status_total.at[s, "sum"])}
+        for s in statuses
+    }
 
-    def _get_time_series(date_col):
-        df_temp = df.copy()
-        df_temp["temp_month"] = pd.to_datetime(df_temp[date_col]).dt.to_period("M")
-        df_temp = df_temp.dropna(subset=["temp_month"])
-        months_sorted = sorted(df_temp["temp_month"].unique())
+    def _get_time_series(month_col):
+        # Rows without a date have a NaT month: code -1, dropped by groupby.
+        month_codes, months_sorted = pd.factorize(rows[month_col], sort=True)
         month_labels = [str(m) for m in months_sorted]
         
-        by_status = {}
-        count_by_status = {}
-        for s in STATUS_ORDER[:-1]:
-            by_status[s] = []
-            count_by_status[s] = []
-            for m in months_sorted:
-                mask = (df_temp["temp_month"] == m) & (df_temp["dashboard_status"] == s)
-                by_status[s].append(float(df_temp.loc[mask, "amount"].sum()))
-                count_by_status[s].append(int(mask.sum()))
-
+        # One hash groupby over (month, status) instead of a mask per cell
+        grouped = rows.groupby([month_col, "dashboard_status"], observed=True)["amount"].agg(["sum", "size"])
+        sums = grouped["sum"].unstack(fill_value=0).reindex(index=months_sorted, columns=statuses, fill_value=0)
+        counts = grouped["size"].unstack(fill_value=0).reindex(index=months_sorted, columns=statuses, fill_value=0)
+        by_status = {s: [float(v) for v in sums[s]] for s in statuses}
+        count_by_status = {s: [int(v) for v in counts[s]] for s in statuses}
+
+        # Won / lost per month in one bincount pass over the month codes
+        n_months = len(months_sorted)
+        dated = month_codes >= 0
+        won_by_month = np.bincount(month_codes[dated & rows["won"].to_numpy()], minlength=n_months)
+        lost_by_month = np.bincount(month_codes[dated & rows["lost"].to_numpy()], minlength=n_months)
         success = []
-        for m in months_sorted:
-            mask_month = df_temp["temp_month"] == m
-            lost_m = (mask_month & (df_temp["status"] == "Accepted")).sum()
-            won_m = (mask_month & (df_temp["status"] == "Won")).sum()
-            total_m = lost_m + won_m
+        for won_m, lost_m in zip(won_by_month.tolist(), lost_by_month.tolist()):
+            total_m = won_m + lost_m
             success.append(round(won_m / total_m * 100, 1) if total_m else 0)
             
         return month_labels, by_status, count_by_status, success
 
-    month_labels_payment, by_status_payment, count_by_status_payment, success_payment = _get_time_series("payment_date")
-    month_labels_cb, by_status_cb, count_by_status_cb, success_cb = _get_time_series("chargeback_received_date")
-
-    # --- Top 10 Operators ---
-    top_operators = (
-        df.groupby("operator")
-        .agg(count=("operator", "size"), total=("amount", "sum"))
-        .sort_values("count", ascending=False)
-        .head(10)
-        .reset_index()
-    )
-    
-    # --- Top 10 Operators (Won) ---
-    top_operators_won = (
-        df[df["status"] == "Won"].groupby("operator")
-        .agg(count=("operator", "size"), total=("amount", "sum"))
-        .sort_values("count", ascending=False)
-        .head(10)
-        .reset_index()
-    )
-
-    # --- Top 10 Banks (Total CBs) ---
-    top_banks_total = (
-        df.groupby("bank")
-        .agg(count=("bank", "size"), total=("amount", "sum"))
-        .sort_values("count", ascending=False)
-        .head(10)
-        .reset_index()
-    )
-    
-    # --- Top 10 Banks (Won CBs) ---
-    top_banks_won = (
-        df[df["status"] == "Won"].groupby("bank")
-        .agg(count=("bank", "size"), total=("amount", "sum"))
-        .sort_values("count", ascending=False)
-        .head(10)
-        .reset_index()
-    )
+    month_labels_payment, by_status_payment, count_by_status_payment, success_payment = _get_time_series("month_payment")
+    month_labels_cb, by_status_cb, count_by_status_cb, success_cb = _get_time_series("month_cb")
+
+    # --- Top 10 Operators / Banks (total & won) ---
+    # One groupby per dimension carries both the total and the won-only
+    # aggregates, so no Won subframe is materialised.
+    def _top10(dim):
+        g = rows.groupby(dim, observed=True).agg(
+            count=("amount", "size"),
+            total=("amount", "sum"),
+            won_count=("won", "sum"),
+            won_total=("won_total", "sum"),
+        )
+        top = g.nlargest(10, "count")[["count", "total"]].reset_index()
+        top_won = (
+            g[g["won_count"] > 0]
+            .nlargest(10, "won_count")[["won_count", "won_total"]]
+            .rename(columns={"won_count": "count", "won_total": "total"})
+            .reset_index()
+        )
+        return top, top_won
+
+    top_operators, top_operators_won = _top10("operator")
+    top_banks_total, top_banks_won = _top10("bank")
 
     # --- Types Donut Data ---
-    # e.g 'visa', 'mastercard', 'amex'
-    types_raw = df["type"].fillna("desconocido").str.lower()
-    
-    # We want to map standard names simply
-    def map_cc_type(t):
-        if 'visa' in t: return 'VISA'
-        if 'mastercard' in t or 'master' in t: return 'MasterCard'
-        if 'amex' in t or 'american' in t: return 'AMEX'
-        return 'Otro'
-        
-    mapped_types = types_raw.apply(map_cc_type)
-    type_counts = mapped_types.value_counts()
+    type_counts = rows["cc_type"].value_counts()
     
     type_donut_labels = list(type_counts.index)
     type_donut_values = [int(v) for v in type_counts.values]
@@ -197,15 +398,14 @@ def _aggregate_dashboard_metrics(df: pd.DataFrame) -> dict:
     type_donut_colors = [cc_colors.get(l, '#9E9E9E') for l in type_donut_labels]
 
     # --- Country Donut Data ---
-    country_raw = df["country"].fillna("Desconocido").str.upper()
-    country_counts = country_raw.value_counts()
+    country_counts = rows["country"].value_counts()
     
     # Keep top 4 countries, group rest as 'OTRO'
     if len(country_counts) > 4:
-        top_countries = country_counts.head(4)
-        otro_count = country_counts.iloc[4:].sum()
-        country_counts = top_countries
-        country_counts["OTRO"] = otro_count
+        country_counts = pd.concat([
+            country_counts.head(4),
+            pd.Series({"OTRO": country_counts.iloc[4:].sum()}),
+        ])
         
     country_donut_labels = list(country_counts.index)
     country_donut_values = [int(v) for v in country_counts.values]
@@ -258,6 +458,87 @@ def _aggregate_dashboard_metrics(df: pd.DataFrame) -> dict:
         "country_donut_colors": country_donut_colors,
     }
 
+def _fillna_category(s: pd.Series, value) -> pd.Series:
+    """fillna() that also works when ``value`` is not yet a category."""
+    if isinstance(s.dtype, pd.CategoricalDtype) and value not in s.cat.categories:
+        s = s.cat.add_categories([value])
+    return s.fillna(value)
+
+
+def _filter_key(value) -> str:
+    """Canonical form shared by the Casos select option values and row labels."""
+    return str(value).strip().lower()
+
+
+def _pack_columns(arrays: dict) -> tuple:
+    """
+    Pack little-endian numpy arrays into one base64 block. Returns the
+    block and a {name: [TypedArray name, byte offset, length]} layout;
+    columns start on 8-byte boundaries so every view is aligned.
+    """
+    parts, layout, offset = [], {}, 0
+    for name, arr in arrays.items():
+        raw = arr.tobytes()
+        layout[name] = [TYPED_ARRAY_NAMES[arr.dtype.str], offset, len(arr)]
+        pad = -len(raw) % 8
+        parts += [raw, b"\0" * pad]
+        offset += len(raw) + pad
+    return base64.b64encode(b"".join(parts)).decode("ascii"), layout
+
+
+def _casos_columns(df_display: pd.DataFrame) -> tuple:
+    """
+    Casos table payload as structure-of-arrays: numeric amounts, day
+    numbers for filtering, epoch seconds for sorting and small-int
+    category codes with their label tables. The numeric columns are
+    returned packed (see _pack_columns) next to the JSON part; formatting
+    into table rows happens in the page script (casoRowHTML).
+    """
+    def _days(col):
+        # Days since epoch of the stored (naive) timestamp, -1 when missing
+        ts = df_display[col]
+        days = ts.to_numpy().astype("datetime64[D]").astype("int64")
+        return np.where(ts.isna(), -1, days).astype("<i4")
+
+    def _secs(col):
+        # Sort keys in epoch seconds, 0 when missing
+        ts = df_display[col]
+        secs = ts.to_numpy().astype("datetime64[s]").astype("int64")
+        return np.where(ts.isna(), 0, secs).astype("<u4")
+
+    card = df_display["credit_card"].astype(str)
+    card = card.where(card.str.len() >= 4, "")
+
+    # Amounts travel as whole cents (as displayed), which pack and compress
+    # far better than raw doubles
+    cents = np.rint(df_display["amount"].to_numpy(dtype="float64", na_value=0.0) * 100)
+    fits_i4 = cents.size == 0 or np.abs(cents).max() < 2**31
+    arrays = {
+        "amount_cents": cents.astype("<i4" if fits_i4 else "<f8"),
+        "fought": df_display["is_fought"].astype(bool).to_numpy(dtype="u1"),
+    }
+    labels, filter_keys = {}, {}
+    for col in ("operator", "type", "bank", "status"):
+        col_codes, uniques = pd.factorize(df_display[col])
+        arrays[col] = col_codes.astype("<u2" if len(uniques) <= 0xFFFF else "<u4")
+        labels[col] = [str(u) for u in uniques]
+        filter_keys[col] = [_filter_key(u) for u in uniques]
+    for key, col in (("pay", "payment_date"), ("cb", "chargeback_received_date"),
+                     ("sub", "submission_date"), ("res", "result_date")):
+        arrays[f"day_{key}"] = _days(col)
+    for key, col in (("pay", "payment_date"), ("sub", "submission_date"), ("res", "result_date")):
+        arrays[f"ts_{key}"] = _secs(col)
+
+    packed, layout = _pack_columns(arrays)
+    return {
+        "user_id": df_display["user_id"].tolist(),
+        "card": card.tolist(),
+        "labels": labels,
+        "filter_keys": filter_keys,
+        "layout": layout,
+    }, packed
+
+
 def process_data(df: pd.DataFrame) -> dict:
     """
     Aggregate the raw dataframe into summary structures
@@ -265,78 +546,41 @@ def process_data(df: pd.DataFrame) -> dict:
     """
     # Normalise
     df["amount"] = df["amount"].astype(float)
-    df["status"] = df["status"].where(df["status"].notna(), None)
-    
-    # Dashboard-specific status split
-    df["dashboard_status"] = df["status"]
-    df.loc[df["status"].isna() & (df["is_fought"] == 1), "dashboard_status"] = "N/A (fought)"
-    df.loc[df["status"].isna() & (df["is_fought"] == 0), "dashboard_status"] = "N/A (non-fought)"
-    
-    # We use submission_date for the month aggregations. 
-    # Use payment_date as fallback if there is no submission_date (unfought cb)
-    df["dashboard_date"] = pd.to_datetime(df["submission_date"])
-    df["dashboard_date"] = df["dashboard_date"].fillna(pd.to_datetime(df["payment_date"]))
-    df["month"] = df["dashboard_date"].dt.to_period("M")
+    # Parse every date column once, to numpy datetime64 (Arrow timestamps
+    # have no .dt.to_period); everything downstream uses .dt directly
+    for col in DATE_COLUMNS:
+        df[col] = pd.to_datetime(df[col], errors="coerce").astype("datetime64[ns]")
+
+    # Low-cardinality strings: groupby / == / .str work on the int codes.
+    # Missing values (None, NaN or pd.NA) all become the -1 code here, so
+    # status needs no separate None normalisation.
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+
+    # Masks and group keys are computed once on the full frame
+    rows = _metric_rows(df)
 
     # Metrics for all chargebacks
-    all_metrics = _aggregate_dashboard_metrics(df)
+    all_metrics = _aggregate_dashboard_metrics(rows)
     
-    # Metrics specifically for fought cb
-    fought_df = df[df["is_fought"] == 1].copy()
-    fought_metrics = _aggregate_dashboard_metrics(fought_df)
+    # Metrics specifically for fought cb (narrow slice, no full-frame copy)
+    fought_metrics = _aggregate_dashboard_metrics(rows[rows["fought"]])
 
 
     # --- Format Casos data for table ---
     # Need to handle NaT and NaN appropriately
-    casos_rows = []
-    
-    if not df.empty:
-        # Fill missing values for cleaner display
-        df_display = df.copy()
-        df_display = df_display.fillna({
+    # Fill missing values for cleaner display
+    df_display = df.assign(**{
+        col: _fillna_category(df[col], value) for col, value in {
             'operator': '',
             'credit_card': '',
             'type': '',
             'bank': '',
             'country': '',
             'status': 'N/A'
-        })
-        
-        for idx, row in df_display.iterrows():
-            payment_date = row['payment_date'].strftime('%d/%m/%Y %H:%M') if pd.notnull(row['payment_date']) else '-'
-            cb_date = row['chargeback_received_date'].strftime('%d/%m/%Y') if pd.notnull(row['chargeback_received_date']) else '-'
-            sub_date = row['submission_date'].strftime('%d/%m/%Y') if pd.notnull(row['submission_date']) else '-'
-            res_date = row['result_date'].strftime('%d/%m/%Y') if pd.notnull(row['result_date']) else '-'
-            
-            # Format status badge if it exists in config
-            status_text = row['status']
-            badge_html = status_text
-            if status_text in STATUS_CONFIG:
-                cfg = STATUS_CONFIG[status_text]
-                badge_html = f'<span style="background:{cfg["bg"]}; color:{cfg["color"]}; padding:4px 8px; border-radius:4px; font-weight:600; font-size:0.8rem; border:1px solid {cfg["color"]}">{cfg["label"]}</span>'
-            elif status_text != 'N/A' and status_text is not None:
-                # Fallback for unmapped statuses
-                badge_html = f'<span style="background:#ECEFF1; color:#607D8B; padding:4px 8px; border-radius:4px; font-weight:600; font-size:0.8rem; border:1px solid #607D8B">{status_text}</span>'
-            
-            is_fought_html = '<td><span style="color:#4CAF50;font-weight:bold">Sí</span></td>' if row['is_fought'] else '<td><span style="color:#F44336;font-weight:bold">No</span></td>'
-            
-            html_row = f"""
-            <tr>
-                <td>{row['user_id']}</td>
-                <td style="font-weight:600">${float(row['amount']):,.2f}</td>
-                <td>{row['operator']}</td>
-                <td><span style="font-family:monospace; background:#f0eef5; padding:2px 4px; border-radius:4px">{row['credit_card'] if row['credit_card'] and len(row['credit_card']) >= 4 else ''}</span></td>
-                <td>{str(row["type"]).capitalize() if row["type"] else "-"}</td>
-                <td>{row['bank']}</td>
-                <td data-sort="{row['payment_date'].timestamp() if pd.notnull(row['payment_date']) else 0}">{payment_date}</td>
-                <td>{cb_date}</td>
-                {is_fought_html}
-                <td>{badge_html}</td>
-                <td data-sort="{row['submission_date'].timestamp() if pd.notnull(row['submission_date']) else 0}">{sub_date}</td>
-                <td data-sort="{row['result_date'].timestamp() if pd.notnull(row['result_date']) else 0}">{res_date}</td>
-            </tr>
-            """
-            casos_rows.append(html_row)
+        }.items()
+    })
+    casos_columns, casos_packed = _casos_columns(df_display)
 
     # -- Extract Unique Filter Values --
     casos_filters = {
@@ -347,15 +591,18 @@ def process_data(df: pd.DataFrame) -> dict:
     }
     
     if not df.empty:
-        # Extract sorted unique non-empty values
-        ops = [str(x) for x in df_display['operator'].dropna().unique() if str(x).strip()]
-        typs = [str(x).capitalize() for x in df_display['type'].dropna().unique() if str(x).strip()]
-        bnks = [str(x) for x in df_display['bank'].dropna().unique() if str(x).strip()]
+        # Extract sorted unique non-empty values; the str/strip work runs
+        # on the (few) uniques rather than on every row
+        def _observed(col):
+            values = pd.Index(df_display[col].dropna().unique()).astype(str)
+            return values[values.str.strip() != ""]
+
+        ops = _observed('operator').tolist()
+        typs = _observed('type').str.capitalize().tolist()
+        bnks = _observed('bank').tolist()
         
-        # Determine actual rendered statuses
-        stss = set()
-        for idx, row in df_display.iterrows():
-            stss.add(row['status'] if row['status'] in STATUS_CONFIG else (row['status'] if pd.notnull(row['status']) else 'N/A'))
+        # Actual rendered statuses (missing ones were already filled as 'N/A')
+        stss = pd.Index(df_display['status'].unique()).astype(str).tolist()
             
         casos_filters = {
             "operators": sorted(ops),
@@ -367,12 +614,17 @@ def process_data(df: pd.DataFrame) -> dict:
     return {
         "all": all_metrics,
         "fought": fought_metrics,
-        "casos_table_rows": "".join(casos_rows),
+        "casos_columns": casos_columns,
+        "casos_packed": casos_packed,
         "casos_filters": casos_filters
     }
 
 def _json(obj):
     """Safely serialise for embedding in JS."""
+    if orjson is not None:
+        # Single C-level walk; NaN/inf are written as null natively
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
     import math
     
     # helper to clean objects so JSON doesn't crash on NaNs
@@ -388,15 +640,24 @@ def _json(obj):
     return json.dumps(clean_obj(obj), ensure_ascii=False)
 
 
-def generate_html(data: dict) -> str:
-    """Return the full HTML string for the dashboard."""
+def write_html(data: dict, fp, now=None):
+    """Stream the dashboard HTML to the text file object ``fp``."""
+    for chunk in _html_chunks(data, now):
+        fp.write(chunk)
 
-    now = datetime.now().strftime("%d/%m/%Y %H:%M")
+
+def _html_chunks(data: dict, now=None):
+    """
+    Yield the dashboard HTML in pieces; the large JSON payloads are
+    separate chunks, so the page is never built as one string.
+    """
+    if now is None:
+        now = datetime.now().strftime("%d/%m/%Y %H:%M")
 
     # Pass configuration dynamically to JS
     js_status_config = {s: {"label": STATUS_CONFIG[s]["label"], "color": STATUS_CONFIG[s]["color"]} for s in STATUS_ORDER[:-1]}
 
-    html = f"""<!DOCTYPE html>
+    yield f"""<!DOCTYPE html>
 <html lang="es">
 <head>
 <meta charset="UTF-8">
@@ -888,7 +1149,7 @@ input:checked + .slider:before {{
             <label>Operador</label>
             <select id="f-operator" class="filter-input">
                 <option value="">Todos</option>
-                {''.join(f'<option value="{op}">{op}</option>' for op in data['casos_filters']['operators'])}
+                {''.join(f'<option value="{_filter_key(op)}">{op}</option>' for op in data['casos_filters']['operators'])}
             </select>
         </div>
 
@@ -896,7 +1157,7 @@ input:checked + .slider:before {{
             <label>Tipo Tarjeta</label>
             <select id="f-type" class="filter-input">
                 <option value="">Todos</option>
-                {''.join(f'<option value="{typ}">{typ}</option>' for typ in data['casos_filters']['types'])}
+                {''.join(f'<option value="{_filter_key(typ)}">{typ}</option>' for typ in data['casos_filters']['types'])}
             </select>
         </div>
 
@@ -904,7 +1165,7 @@ input:checked + .slider:before {{
             <label>Banco</label>
             <select id="f-bank" class="filter-input">
                 <option value="">Todos</option>
-                {''.join(f'<option value="{bnk}">{bnk}</option>' for bnk in data['casos_filters']['banks'])}
+                {''.join(f'<option value="{_filter_key(bnk)}">{bnk}</option>' for bnk in data['casos_filters']['banks'])}
             </select>
         </div>
 
@@ -912,7 +1173,7 @@ input:checked + .slider:before {{
             <label>Estado</label>
             <select id="f-status" class="filter-input">
                 <option value="">Todos</option>
-                {''.join(f'<option value="{sts}">{sts}</option>' for sts in data['casos_filters']['statuses'])}
+                {''.join(f'<option value="{_filter_key(sts)}">{sts}</option>' for sts in data['casos_filters']['statuses'])}
             </select>
         </div>
 
@@ -920,8 +1181,8 @@ input:checked + .slider:before {{
             <label>Peleado</label>
             <select id="f-fought" class="filter-input">
                 <option value="">Todos</option>
-                <option value="Sí">Sí</option>
-                <option value="No">No</option>
+                <option value="sí">Sí</option>
+                <option value="no">No</option>
             </select>
         </div>
 
@@ -985,9 +1246,7 @@ input:checked + .slider:before {{
             <th class="sortable" data-col="11">Fecha Res.</th>
           </tr>
         </thead>
-        <tbody id="casos-tbody">
-          {data['casos_table_rows']}
-        </tbody>
+        <tbody id="casos-tbody"></tbody>
       </table>
       
       <!-- Pagination Controls -->
@@ -1004,7 +1263,22 @@ input:checked + .slider:before {{
 </div><!-- /main -->
 
 <!-- ── Scripts ─────────────────────────────────────────────── -->
+<script id="casos-data" type="application/octet-stream">"""
+    yield data['casos_packed']
+    yield f"""</script>
 <script>
+/* ── Cached Elements ────────────────────────────────────────── */
+// Elements touched on every render are looked up once
+const $ = {{}};
+for (const id of [
+    'val_total_records', 'val_total_amount', 'val_fought_amount', 'val_fought_count',
+    'val_recovered_amount', 'val_won_count', 'val_lost_amount', 'val_lost_count',
+    'val_success_rate', 'status_cards_container',
+    'list_operators', 'list_operators_won', 'list_banks_total', 'list_banks_won',
+    'page-info', 'page-buttons',
+    'foughtToggle', 'mainChartToggle', 'dateChartToggle', 'mainChartTitle',
+]) $[id] = document.getElementById(id);
+
 /* ── Navigation Logic ───────────────────────────────────────── */
 document.querySelectorAll('.nav-link').forEach(link => {{
   link.addEventListener('click', function(e) {{
@@ -1028,8 +1302,101 @@ document.querySelectorAll('.nav-link').forEach(link => {{
 const rowsPerPage = 50;
 let currentPage = 1;
 const tbody = document.getElementById('casos-tbody');
-const allRows = Array.from(tbody.querySelectorAll('tr'));
-let currentRows = [...allRows]; 
+
+// Casos rows arrive as column arrays (see _casos_columns) and are
+// formatted here, so the generator does no per-row HTML work. Numeric
+// columns are typed-array views into the packed #casos-data block.
+const CASOS = """
+    yield _json(data['casos_columns'])
+    yield f""";
+const casosBinary = atob(document.getElementById('casos-data').textContent.trim());
+const casosBytes = new Uint8Array(casosBinary.length);
+for (let i = 0; i < casosBinary.length; i++) casosBytes[i] = casosBinary.charCodeAt(i);
+const TYPED_ARRAYS = {{ Float64Array, Int32Array, Uint32Array, Uint16Array, Uint8Array }};
+function casosColumn(name) {{
+  const [type, offset, length] = CASOS.layout[name];
+  return new TYPED_ARRAYS[type](casosBytes.buffer, offset, length);
+}}
+
+const AMOUNT = Float64Array.from(casosColumn('amount_cents'), cents => cents / 100);
+const ROW_COUNT = AMOUNT.length;
+const FOUGHT = casosColumn('fought');
+const OP = casosColumn('operator');
+const TYP = casosColumn('type');
+const BNK = casosColumn('bank');
+const STS = casosColumn('status');
+// Day numbers (days since epoch, -1 when missing) used by the date filters
+const DAY_PAY = casosColumn('day_pay');
+const DAY_CB = casosColumn('day_cb');
+const DAY_SUB = casosColumn('day_sub');
+const DAY_RES = casosColumn('day_res');
+// Epoch seconds (0 when missing) behind the sortable date columns
+const TS_PAY = casosColumn('ts_pay');
+const TS_SUB = casosColumn('ts_sub');
+const TS_RES = casosColumn('ts_res');
+
+const STATUS_BADGES = {_json(STATUS_BADGE_HTML)};
+const fmtAmount = new Intl.NumberFormat('en-US', {{ minimumFractionDigits: 2, maximumFractionDigits: 2 }});
+const pad2 = n => (n < 10 ? '0' : '') + n;
+
+// Day numbers (days since 1970-01-01) <-> calendar dates with integer
+// arithmetic only, no Date objects (H. Hinnant's civil date algorithms)
+function daysFromCivil(y, m, d) {{
+  y -= m <= 2 ? 1 : 0;
+  const era = Math.floor(y / 400);
+  const yoe = y - era * 400;
+  const doy = Math.floor((153 * (m > 2 ? m - 3 : m + 9) + 2) / 5) + d - 1;
+  return era * 146097 + yoe * 365 + Math.floor(yoe / 4) - Math.floor(yoe / 100) + doy - 719468;
+}}
+
+// DD/MM/YYYY of a day number; stored timestamps are naive, so no timezone
+function fmtDay(day) {{
+  if (day < 0) return '-';
+  const z = day + 719468;
+  const era = Math.floor(z / 146097);
+  const doe = z - era * 146097;
+  const yoe = Math.floor((doe - Math.floor(doe / 1460) + Math.floor(doe / 36524) - Math.floor(doe / 146096)) / 365);
+  const doy = doe - (365 * yoe + Math.floor(yoe / 4) - Math.floor(yoe / 100));
+  const mp = Math.floor((5 * doy + 2) / 153);
+  const m = mp < 10 ? mp + 3 : mp - 9;
+  const y = yoe + era * 400 + (m <= 2 ? 1 : 0);
+  return `${{pad2(doy - Math.floor((153 * mp + 2) / 5) + 1)}}/${{pad2(m)}}/${{y}}`;
+}}
+
+function fmtDayTime(day, sec) {{
+  if (day < 0) return '-';
+  const secOfDay = sec - day * 86400;
+  return `${{fmtDay(day)}} ${{pad2(Math.floor(secOfDay / 3600))}}:${{pad2(Math.floor(secOfDay / 60) % 60)}}`;
+}}
+
+// Per-code cell contents, computed once at load
+// rather than per rendered row
+const TYPE_CELLS = CASOS.labels.type.map(type =>
+    type ? type.charAt(0).toUpperCase() + type.slice(1).toLowerCase() : '-');
+const STATUS_CELLS = CASOS.labels.status.map(status =>
+    STATUS_BADGES[status] || (status === 'N/A' ? 'N/A' :
+      `<span style="background:#ECEFF1; color:#607D8B; padding:4px 8px; border-radius:4px; font-weight:600; font-size:0.8rem; border:1px solid #607D8B">${{status}}</span>`));
+const FOUGHT_CELLS = [
+    '<td><span style="color:#F44336;font-weight:bold">No</span></td>',
+    '<td><span style="color:#4CAF50;font-weight:bold">Sí</span></td>',
+];
+// Per-code filter keys, canonicalised server-side like the option values
+const FILTER_KEYS = {{ ...CASOS.filter_keys, fought: ['no', 'sí'] }};
+
+function casoRowHTML(i) {{
+  return `<tr><td>${{CASOS.user_id[i]}}</td><td style="font-weight:600">$${{fmtAmount.format(AMOUNT[i])}}</td><td>${{CASOS.labels.operator[OP[i]]}}</td>`
+      + `<td><span style="font-family:monospace; background:#f0eef5; padding:2px 4px; border-radius:4px">${{CASOS.card[i]}}</span></td>`
+      + `<td>${{TYPE_CELLS[TYP[i]]}}</td><td>${{CASOS.labels.bank[BNK[i]]}}</td>`
+      + `<td>${{fmtDayTime(DAY_PAY[i], TS_PAY[i])}}</td><td>${{fmtDay(DAY_CB[i])}}</td>`
+      + `${{FOUGHT_CELLS[FOUGHT[i]]}}<td>${{STATUS_CELLS[STS[i]]}}</td>`
+      + `<td>${{fmtDay(DAY_SUB[i])}}</td><td>${{fmtDay(DAY_RES[i])}}</td></tr>`;
+}}
+
+// Rows are indices into CASOS: filtering and sorting work on these arrays
+// and only the current page is rendered into tbody
+const allRows = Uint32Array.from(AMOUNT.keys());
+const matchedRows = new Uint32Array(ROW_COUNT);
+let currentRows = allRows.slice();
 
 // Filter Elements
 const fAmountMin = document.getElementById('f-amount-min');
@@ -1049,116 +1416,108 @@ const fDateSubEnd = document.getElementById('f-date-sub-end');
 const fDateResStart = document.getElementById('f-date-res-start');
 const fDateResEnd = document.getElementById('f-date-res-end');
 
-// Helper to parse DD/MM/YYYY into JS Date
-function parseDMY(dateStr) {{
-    if (!dateStr || dateStr === '-') return null;
-    const parts = dateStr.split(' ')[0].split('/'); // handles DD/MM/YYYY HH:MM and DD/MM/YYYY
-    if (parts.length === 3) {{
-        // Months are 0-indexed in JS
-        return new Date(parts[2], parseInt(parts[1])-1, parts[0]);
-    }}
-    return null;
+// Helper to parse YYYY-MM-DD from input type="date" into a day number,
+// reading the digits directly
+function parseYMD(dateStr) {{
+    if (!dateStr || dateStr.length !== 10) return null;
+    const c = i => dateStr.charCodeAt(i) - 48;
+    return daysFromCivil(c(0) * 1000 + c(1) * 100 + c(2) * 10 + c(3), c(5) * 10 + c(6), c(8) * 10 + c(9));
 }}
 
-// Helper to parse YYYY-MM-DD from input type="date"
-function parseYMD(dateStr) {{
-    if (!dateStr) return null;
-    const parts = dateStr.split('-');
-    if (parts.length === 3) {{
-        return new Date(parts[0], parseInt(parts[1])-1, parts[2]);
+// Inclusive [start, end] day range of a date filter pair, or null when
+// unset. Missing dates (-1) always fall outside an active range.
+function dayRange(startEl, endEl) {{
+    const start = parseYMD(startEl.value);
+    const end = parseYMD(endEl.value);
+    if (start === null && end === null) return null;
+    return [Math.max(start ?? 0, 0), end ?? 0x7fffffff];
+}}
+
+// Row bitsets (32 rows per word) for select filter values, built from the
+// code arrays on first use so combining filters is a word-wise AND
+const MASK_WORDS = (ROW_COUNT + 31) >>> 5;
+const ALL_ROWS_MASK = new Uint32Array(MASK_WORDS);
+for (let i = 0; i < ROW_COUNT; i++) ALL_ROWS_MASK[i >>> 5] |= 1 << (i & 31);
+const bitsetCache = new Map();
+
+// Bitset of the rows whose filter key matches a select value, or null when unset
+function selectBitset(name, codes, value) {{
+    if (!value) return null;
+    const key = name + '\\u0000' + value;
+    let bits = bitsetCache.get(key);
+    if (!bits) {{
+        const match = Uint8Array.from(FILTER_KEYS[name], k => k === value ? 1 : 0);
+        bits = new Uint32Array(MASK_WORDS);
+        for (let i = 0; i < ROW_COUNT; i++) {{
+            if (match[codes[i]]) bits[i >>> 5] |= 1 << (i & 31);
+        }}
+        bitsetCache.set(key, bits);
     }}
-    return null;
+    return bits;
 }}
 
+let filterTimer;
 function applyFilters() {{
+  // A direct run supersedes any pending debounced one
+  clearTimeout(filterTimer);
+
   const minAmt = parseFloat(fAmountMin.value);
   const maxAmt = parseFloat(fAmountMax.value);
-  const operatorVal = fOperator.value.toLowerCase();
-  const typeVal = fType.value.toLowerCase();
-  const bankVal = fBank.value.toLowerCase();
-  const statusVal = fStatus.value.toLowerCase();
-  const foughtVal = fFought.value;
-
-  const dpStart = parseYMD(fDatePayStart.value);
-  const dpEnd = parseYMD(fDatePayEnd.value);
-  if (dpEnd) dpEnd.setHours(23, 59, 59, 999);
-
-  const dcbStart = parseYMD(fDateCbStart.value);
-  const dcbEnd = parseYMD(fDateCbEnd.value);
-  if (dcbEnd) dcbEnd.setHours(23, 59, 59, 999);
-
-  const dsubStart = parseYMD(fDateSubStart.value);
-  const dsubEnd = parseYMD(fDateSubEnd.value);
-  if (dsubEnd) dsubEnd.setHours(23, 59, 59, 999);
-
-  const dresStart = parseYMD(fDateResStart.value);
-  const dresEnd = parseYMD(fDateResEnd.value);
-  if (dresEnd) dresEnd.setHours(23, 59, 59, 999);
-
-  currentRows = allRows.filter(tr => {{
-      const cells = tr.cells;
-      
-      // Amount (Col 1)
-      const amtStr = cells[1].textContent.replace(/[^0-9.-]+/g, '');
-      const amt = parseFloat(amtStr) || 0;
-      if (!isNaN(minAmt) && amt < minAmt) return false;
-      if (!isNaN(maxAmt) && amt > maxAmt) return false;
-
-      // Operator (Col 2)
-      if (operatorVal && cells[2].textContent.trim().toLowerCase() !== operatorVal) return false;
-      
-      // Type (Col 4)
-      if (typeVal && cells[4].textContent.trim().toLowerCase() !== typeVal) return false;
-      
-      // Bank (Col 5)
-      if (bankVal && cells[5].textContent.trim().toLowerCase() !== bankVal) return false;
-
-      // Fought (Col 8)
-      if (foughtVal && cells[8].textContent.trim() !== foughtVal) return false;
-
-      // Status (Col 9)
-      if (statusVal && cells[9].textContent.trim().toLowerCase() !== statusVal) return false;
-
-      // Date Filters (Col 6, 7, 10, 11)
-      try {{
-          const dp = parseDMY(cells[6].textContent.trim());
-          if (dpStart && (!dp || dp < dpStart)) return false;
-          if (dpEnd && (!dp || dp > dpEnd)) return false;
-
-          const dcb = parseDMY(cells[7].textContent.trim());
-          if (dcbStart && (!dcb || dcb < dcbStart)) return false;
-          if (dcbEnd && (!dcb || dcb > dcbEnd)) return false;
-
-          const dsub = parseDMY(cells[10].textContent.trim());
-          if (dsubStart && (!dsub || dsub < dsubStart)) return false;
-          if (dsubEnd && (!dsub || dsub > dsubEnd)) return false;
-
-          const dres = parseDMY(cells[11].textContent.trim());
-          if (dresStart && (!dres || dres < dresStart)) return false;
-          if (dresEnd && (!dres || dres > dresEnd)) return false;
-      }} catch (e) {{
-          console.error("Filter date parse error", e);
-      }}
+  const amtLo = isNaN(minAmt) ? -Infinity : minAmt;
+  const amtHi = isNaN(maxAmt) ? Infinity : maxAmt;
+
+  const mask = ALL_ROWS_MASK.slice();
+  for (const bits of [
+      selectBitset('operator', OP, fOperator.value),
+      selectBitset('type', TYP, fType.value),
+      selectBitset('bank', BNK, fBank.value),
+      selectBitset('status', STS, fStatus.value),
+      selectBitset('fought', FOUGHT, fFought.value),
+  ]) {{
+      if (bits) for (let w = 0; w < MASK_WORDS; w++) mask[w] &= bits[w];
+  }}
 
-      return true;
-  }});
+  const dp = dayRange(fDatePayStart, fDatePayEnd);
+  const dcb = dayRange(fDateCbStart, fDateCbEnd);
+  const dsub = dayRange(fDateSubStart, fDateSubEnd);
+  const dres = dayRange(fDateResStart, fDateResEnd);
+
+  // Range filters only visit the rows that survived the select filters
+  let n = 0;
+  for (let w = 0; w < MASK_WORDS; w++) {{
+      let word = mask[w];
+      while (word) {{
+          const low = word & -word;
+          word ^= low;
+          const i = (w << 5) | (31 - Math.clz32(low));
+          const amt = AMOUNT[i];
+          if (amt < amtLo || amt > amtHi) continue;
+          if (dp && (DAY_PAY[i] < dp[0] || DAY_PAY[i] > dp[1])) continue;
+          if (dcb && (DAY_CB[i] < dcb[0] || DAY_CB[i] > dcb[1])) continue;
+          if (dsub && (DAY_SUB[i] < dsub[0] || DAY_SUB[i] > dsub[1])) continue;
+          if (dres && (DAY_RES[i] < dres[0] || DAY_RES[i] > dres[1])) continue;
+          matchedRows[n++] = i;
+      }}
+  }}
+  currentRows = matchedRows.slice(0, n);
+  tbodyNeedsRender = true;
 
   // Reset to first page after filtering
   currentPage = 1;
 
-  // Preserve existing sort order if active
-  const activeSort = document.querySelector('.sortable.asc, .sortable.desc');
-  if (activeSort) {{
-      // Temporarily trigger click to re-sort (which flips it), so we manually enforce it
-      // Actually, better to just let standard re-render happen, standard users just click headers again
-  }}
-
   renderTable();
 }}
 
-// Attach event listeners to all filter inputs
+// Coalesce bursts of keystrokes into one filter pass (trailing edge)
+function scheduleFilter() {{
+    clearTimeout(filterTimer);
+    filterTimer = setTimeout(applyFilters, 120);
+}}
+
+// Attach event listeners to all filter inputs; 'change' fires once per
+// commit so it filters immediately
 document.querySelectorAll('#casos-filters input, #casos-filters select').forEach(el => {{
-    el.addEventListener('input', applyFilters);
+    el.addEventListener('input', scheduleFilter);
     el.addEventListener('change', applyFilters);
 }});
 
@@ -1168,34 +1527,37 @@ document.getElementById('btn-reset-filters').addEventListener('click', () => {{
 }});
 
 
+// Set whenever currentRows is replaced or reordered
+let tbodyNeedsRender = true;
+let renderedStart = -1;
+
 function renderTable() {{
   const totalPages = Math.ceil(currentRows.length / rowsPerPage);
   if (currentPage < 1) currentPage = 1;
   if (currentPage > totalPages && totalPages > 0) currentPage = totalPages;
 
-  // Hide all rows
-  allRows.forEach(tr => tr.style.display = 'none');
-  
-  // Detach sorted rows conceptually, and re-append them in correct order
-  // For performance with many rows, we just hide/show, but since we MIGHT be sorted, we must append them in order to tbody.
-  tbody.innerHTML = '';
-  currentRows.forEach(tr => tbody.appendChild(tr));
-
   const startIdx = (currentPage - 1) * rowsPerPage;
   const endIdx = Math.min(startIdx + rowsPerPage, currentRows.length);
 
-  // Show only page rows
-  for (let i = startIdx; i < endIdx; i++) {{
-    currentRows[i].style.display = '';
+  // Only the current page is ever in the DOM, and it is only rewritten
+  // when the rows or their order changed or another page was picked
+  if (tbodyNeedsRender || startIdx !== renderedStart) {{
+    const pageRows = new Array(endIdx - startIdx);
+    for (let i = startIdx; i < endIdx; i++) {{
+      pageRows[i - startIdx] = casoRowHTML(currentRows[i]);
+    }}
+    tbody.innerHTML = pageRows.join('');
+    tbodyNeedsRender = false;
+    renderedStart = startIdx;
   }}
 
   // Update info
-  const infoEl = document.getElementById('page-info');
+  const infoEl = $['page-info'];
   infoEl.innerText = `Mostrando ${{currentRows.length > 0 ? startIdx + 1 : 0}}-${{endIdx}} de ${{currentRows.length}} casos`;
 
   // Update buttons
-  const btnContainer = document.getElementById('page-buttons');
-  btnContainer.innerHTML = '';
+  // Buttons are assembled off-document and swapped in with one append
+  const btnContainer = document.createDocumentFragment();
 
   // Prev
   const prevBtn = document.createElement('button');
@@ -1252,12 +1614,17 @@ function renderTable() {{
   nextBtn.disabled = currentPage === totalPages || totalPages === 0;
   nextBtn.onclick = () => {{ currentPage++; renderTable(); }};
   btnContainer.appendChild(nextBtn);
+
+  const pageButtons = $['page-buttons'];
+  pageButtons.innerHTML = '';
+  pageButtons.appendChild(btnContainer);
 }}
 
 // Initialize Table
 renderTable();
 
 // Sorting Logic
+const SORT_KEYS = {{ 6: TS_PAY, 10: TS_SUB, 11: TS_RES }};
 document.querySelectorAll('.sortable').forEach(th => {{
   th.addEventListener('click', function() {{
     const colIdx = parseInt(this.getAttribute('data-col'));
@@ -1273,24 +1640,18 @@ document.querySelectorAll('.sortable').forEach(th => {{
     const direction = isAsc ? -1 : 1;
     this.classList.add(isAsc ? 'desc' : 'asc');
 
-    currentRows.sort((a, b) => {{
-      const cellA = a.cells[colIdx];
-      const cellB = b.cells[colIdx];
-      
-      let valA, valB;
-      
-      if (isAmount) {{
-         // Parse "$1,234.56" to 1234.56
-         valA = parseFloat(cellA.textContent.replace(/[^0-9.-]+/g, '')) || 0;
-         valB = parseFloat(cellB.textContent.replace(/[^0-9.-]+/g, '')) || 0;
-      }} else {{
-         // Fallback to data-sort timestamp for dates
-         valA = parseFloat(cellA.getAttribute('data-sort')) || 0;
-         valB = parseFloat(cellB.getAttribute('data-sort')) || 0;
-      }}
+    // Amount, or the timestamp behind the date columns (missing sorts as 0)
+    const keys = isAmount ? AMOUNT : SORT_KEYS[colIdx];
 
-      return valA < valB ? -1 * direction : (valA > valB ? 1 * direction : 0);
-    }});
+    // Decorate-sort-undecorate: gather each row's key once into a
+    // contiguous array, sort positions by it, then map back to rows
+    const n = currentRows.length;
+    const rowKeys = new Float64Array(n);
+    for (let j = 0; j < n; j++) rowKeys[j] = keys[currentRows[j]] || 0;
+    const order = Uint32Array.from(rowKeys.keys());
+    order.sort((a, b) => direction * (rowKeys[a] - rowKeys[b]));
+    currentRows = Uint32Array.from(order, j => currentRows[j]);
+    tbodyNeedsRender = true;
 
     currentPage = 1;
     renderTable();
@@ -1299,248 +1660,344 @@ document.querySelectorAll('.sortable').forEach(th => {{
 
 /* ── Initial Render ────────────────────────── */
 // Ensure we run the render loop after defining everything
-const RAW_DATA = {_json(data)};
+const RAW_DATA = """
+    yield _json({"all": data["all"], "fought": data["fought"]})
+    yield f""";
 const STATUS_CONFIG = {_json(js_status_config)};
-
-let chartObjMain = null;
-let chartObjStatus = null;
-let chartObjSuccess = null;
-let chartObjType = null;
-let chartObjCountry = null;
+// Materialised once so the render loops iterate a plain array
+const STATUS_ENTRIES = Object.entries(STATUS_CONFIG);
 
 const fmtNum = new Intl.NumberFormat('en-US');
 const fmtCur = new Intl.NumberFormat('en-US', {{ style: 'currency', currency: 'USD' }});
 
 function buildStackedDatasets(dataObj, metricKey) {{
-    const ds = [];
-    for (const status in STATUS_CONFIG) {{
-        ds.push({{
-            label: STATUS_CONFIG[status].label,
-            data: dataObj[metricKey][status],
-            backgroundColor: STATUS_CONFIG[status].color,
-            borderRadius: 4
-        }});
-    }}
-    return ds;
+    const byStatus = dataObj[metricKey];
+    return STATUS_ENTRIES.map(([status, cfg]) => ({{
+        label: cfg.label,
+        data: byStatus[status],
+        backgroundColor: cfg.color,
+        borderRadius: 4
+    }}));
 }}
 
+// Static parts of the list row and status card templates; rendering
+// interleaves them with the values and joins once
+const OP_ROW_STATICS = [
+    '<div class="op-row"><span class="op-rank">',
+    '</span><span class="op-name">',
+    '</span><div class="op-bar-wrapper"><div class="op-bar" style="width:',
+    '%"></div></div><span class="op-count">',
+    '</span><span class="op-amount">',
+    '</span></div>',
+];
+const STATUS_CARD_STATICS = [
+    '<div class="status-card" style="border-left: 4px solid ',
+    '; background:',
+    '15"><div class="status-card-label">',
+    '</div><div class="status-card-count">',
+    '</div><div class="status-card-amount">',
+    '</div></div>',
+];
+
 function buildListHTML(listData, totalRecords, nameKey, showPct = false) {{
-    let html = '';
+    const s = OP_ROW_STATICS;
+    const parts = [];
     listData.forEach((item, i) => {{
         const pct = totalRecords ? (item.count / totalRecords * 100) : 0;
         const pctStr = showPct ? ` <span style="font-size:0.8rem;color:#7a7a8c;font-weight:normal;margin-left:4px">(${{pct.toFixed(1)}}%)</span>` : '';
-        html += `
-        <div class="op-row">
-            <span class="op-rank">${{i+1}}</span>
-            <span class="op-name">${{item[nameKey]}}</span>
-            <div class="op-bar-wrapper">
-                <div class="op-bar" style="width:${{pct.toFixed(1)}}%"></div>
-            </div>
-            <span class="op-count">${{fmtNum.format(item.count)}}${{pctStr}}</span>
-            <span class="op-amount">${{fmtCur.format(item.total)}}</span>
-        </div>`;
+        parts.push(s[0], i + 1, s[1], item[nameKey], s[2], pct.toFixed(1),
+                   s[3], fmtNum.format(item.count) + pctStr, s[4], fmtCur.format(item.total), s[5]);
     }});
-    return html;
+    return parts.join('');
 }}
 
-function renderDashboardMode(isFoughtOnly) {{
-    const key = isFoughtOnly ? 'fought' : 'all';
-    const st = RAW_DATA[key];
+function updateStatCards(st) {{
+    $.val_total_records.innerText = fmtNum.format(st.total_records);
+    $.val_total_amount.innerText = fmtCur.format(st.total_amount);
+    $.val_fought_amount.innerText = fmtCur.format(st.fought_amount);
+    $.val_fought_count.innerText = fmtNum.format(st.fought_count);
+    $.val_recovered_amount.innerText = fmtCur.format(st.recovered_amount);
+    $.val_won_count.innerText = fmtNum.format(st.won_count);
+    $.val_lost_amount.innerText = fmtCur.format(st.lost_amount);
+    $.val_lost_count.innerText = fmtNum.format(st.lost_count);
+    $.val_success_rate.innerText = st.success_rate + '%';
     
-    // 1. Update Stat Cards Text
-    document.getElementById('val_total_records').innerText = fmtNum.format(st.total_records);
-    document.getElementById('val_total_amount').innerText = fmtCur.format(st.total_amount);
-    document.getElementById('val_fought_amount').innerText = fmtCur.format(st.fought_amount);
-    document.getElementById('val_fought_count').innerText = fmtNum.format(st.fought_count);
-    document.getElementById('val_recovered_amount').innerText = fmtCur.format(st.recovered_amount);
-    document.getElementById('val_won_count').innerText = fmtNum.format(st.won_count);
-    document.getElementById('val_lost_amount').innerText = fmtCur.format(st.lost_amount);
-    document.getElementById('val_lost_count').innerText = fmtNum.format(st.lost_count);
-    document.getElementById('val_success_rate').innerText = st.success_rate + '%';
-    
-    // 2. Build Status Breakdown HTML
-    let st_html = '';
-    for (const status in STATUS_CONFIG) {{
-        const cfg = STATUS_CONFIG[status];
-        const info = st.status_summary[status];
-        st_html += `
-        <div class="status-card" style="border-left: 4px solid ${{cfg.color}}; background:${{cfg.color}}15">
-            <div class="status-card-label">${{cfg.label}}</div>
-            <div class="status-card-count">${{fmtNum.format(info.count)}}</div>
-            <div class="status-card-amount">${{fmtCur.format(info.amount)}}</div>
-        </div>`;
+    // Status Breakdown
+    const s = STATUS_CARD_STATICS;
+    const st_html = [];
+    const summary = st.status_summary;
+    for (const [status, cfg] of STATUS_ENTRIES) {{
+        const info = summary[status];
+        st_html.push(s[0], cfg.color, s[1], cfg.color, s[2], cfg.label,
+                     s[3], fmtNum.format(info.count), s[4], fmtCur.format(info.amount), s[5]);
     }}
-    document.getElementById('status_cards_container').innerHTML = st_html;
+    $.status_cards_container.innerHTML = st_html.join('');
+}}
 
-    // 3. Build List HTML dynamically
-    document.getElementById('list_operators').innerHTML = buildListHTML(st.top_operators, st.total_records, 'operator', true);
-    document.getElementById('list_operators_won').innerHTML = buildListHTML(st.top_operators_won, st.won_count || 1, 'operator');
-    document.getElementById('list_banks_total').innerHTML = buildListHTML(st.top_banks_total, st.total_records, 'bank', true);
-    document.getElementById('list_banks_won').innerHTML = buildListHTML(st.top_banks_won, st.won_count || 1, 'bank'); // pass won_count as baseline for pct
+function updateLists(st) {{
+    $.list_operators.innerHTML = buildListHTML(st.top_operators, st.total_records, 'operator', true);
+    $.list_operators_won.innerHTML = buildListHTML(st.top_operators_won, st.won_count || 1, 'operator');
+    $.list_banks_total.innerHTML = buildListHTML(st.top_banks_total, st.total_records, 'bank', true);
+    $.list_banks_won.innerHTML = buildListHTML(st.top_banks_won, st.won_count || 1, 'bank'); // pass won_count as baseline for pct
+}}
 
-    // 4. Destroy & Recreate Charts
-    const fontFam = "'Figtree', system-ui, sans-serif";
-    Chart.defaults.font.family = fontFam;
-    
-    // Determine which date grouping suffix to use
-    const dateMetric = document.getElementById('dateChartToggle').value;
-    const suffix = dateMetric === 'payment' ? '_payment' : '_cb';
-    
-    // Determine which metric array is selected for the main chart
-    const mainMetric = document.getElementById('mainChartToggle').value;
-    const arrayName = mainMetric === 'amount' ? `monthly_by_status${{suffix}}` : `monthly_count_by_status${{suffix}}`;
-    
-    if(chartObjMain) chartObjMain.destroy();
-    chartObjMain = new Chart(document.getElementById('chartMain'), {{
-        type: 'bar',
-        data: {{
-            labels: st[`month_labels${{suffix}}`],
-            datasets: buildStackedDatasets(st, arrayName)
-        }},
-        options: {{
-            responsive: true, maintainAspectRatio: false,
-            plugins: {{ 
-                legend: {{ position: 'top', labels: {{font: {{family: fontFam}}}}}}, 
-                tooltip: {{ mode: 'index', intersect: false }} 
-            }},
-            scales: {{ x: {{ stacked: true, grid: {{ display: false }} }}, y: {{ stacked: true, beginAtZero: true }} }}
-        }}
-    }});
+/* Charts are created once and then updated in place. All but the main
+   chart are created the first time their canvas nears the viewport. */
+const fontFam = "'Figtree', system-ui, sans-serif";
+Chart.defaults.font.family = fontFam;
 
-    if(chartObjStatus) chartObjStatus.destroy();
-    chartObjStatus = new Chart(document.getElementById('chartStatus'), {{
-        type: 'doughnut',
-        data: {{
-            labels: st.status_donut_labels,
-            datasets: [{{ data: st.status_donut_values, backgroundColor: st.status_donut_colors }}]
+// Chart type and options per canvas; options are only built when the
+// chart is first created, later renders swap in data alone
+const doughnutOptions = () => ({{
+    responsive: true, maintainAspectRatio: false,
+    plugins: {{ legend: {{ position: 'bottom', labels: {{font: {{family: fontFam}}}}}} }}
+}});
+const CHART_SETUP = {{
+    chartMain: {{ type: 'bar', options: () => ({{
+        responsive: true, maintainAspectRatio: false,
+        plugins: {{ 
+            legend: {{ position: 'top', labels: {{font: {{family: fontFam}}}}}}, 
+            tooltip: {{ mode: 'index', intersect: false }} 
         }},
-        options: {{
-            responsive: true, maintainAspectRatio: false,
-            plugins: {{ legend: {{ position: 'bottom', labels: {{font: {{family: fontFam}}}}}} }}
-        }}
-    }});
+        scales: {{ x: {{ stacked: true, grid: {{ display: false }} }}, y: {{ stacked: true, beginAtZero: true }} }}
+    }}) }},
+    chartSuccess: {{ type: 'line', options: () => ({{
+        responsive: true, maintainAspectRatio: false,
+        plugins: {{ legend: {{ display: false }} }},
+        scales: {{ y: {{ max: 100, min: 0 }} }}
+    }}) }},
+    chartStatus: {{ type: 'doughnut', options: doughnutOptions }},
+    chartType: {{ type: 'doughnut', options: doughnutOptions }},
+    chartCountry: {{ type: 'doughnut', options: doughnutOptions }},
+}};
+
+const charts = {{}};
+const pendingCharts = {{}};
+
+function createChart(canvas, data) {{
+    const setup = CHART_SETUP[canvas.id];
+    charts[canvas.id] = new Chart(canvas, {{ type: setup.type, data: data, options: setup.options() }});
+}}
 
-    if(chartObjType) chartObjType.destroy();
-    chartObjType = new Chart(document.getElementById('chartType'), {{
-        type: 'doughnut',
-        data: {{
-            labels: st.type_donut_labels,
-            datasets: [{{ data: st.type_donut_values, backgroundColor: st.type_donut_colors }}]
-        }},
-        options: {{
-            responsive: true, maintainAspectRatio: false,
-            plugins: {{ 
-                legend: {{ position: 'bottom', labels: {{font: {{family: fontFam}}}}}} 
-            }}
-        }}
-    }});
+const chartObserver = 'IntersectionObserver' in window ? new IntersectionObserver(entries => {{
+    for (const entry of entries) {{
+        if (!entry.isIntersecting) continue;
+        const id = entry.target.id;
+        chartObserver.unobserve(entry.target);
+        createChart(entry.target, pendingCharts[id]);
+        delete pendingCharts[id];
+    }}
+}}, {{ rootMargin: '200px' }}) : null;
+
+// Create the chart, or swap in the new data and redraw without animation
+function syncChart(id, data, lazy) {{
+    const chart = charts[id];
+    if (chart) {{
+        chart.data.labels = data.labels;
+        data.datasets.forEach((ds, k) => Object.assign(chart.data.datasets[k], ds));
+        chart.update('none');
+    }} else if (lazy && chartObserver) {{
+        if (!(id in pendingCharts)) chartObserver.observe(document.getElementById(id));
+        pendingCharts[id] = data;
+    }} else {{
+        createChart(document.getElementById(id), data);
+    }}
+}}
 
-    if(chartObjCountry) chartObjCountry.destroy();
-    chartObjCountry = new Chart(document.getElementById('chartCountry'), {{
-        type: 'doughnut',
-        data: {{
-            labels: st.country_donut_labels,
-            datasets: [{{ data: st.country_donut_values, backgroundColor: st.country_donut_colors }}]
-        }},
-        options: {{
-            responsive: true, maintainAspectRatio: false,
-            plugins: {{ 
-                legend: {{ position: 'bottom', labels: {{font: {{family: fontFam}}}}}} 
-            }}
-        }}
-    }});
+function doughnutData(labels, values, colors) {{
+    return {{ labels: labels, datasets: [{{ data: values, backgroundColor: colors }}] }};
+}}
 
-    if(chartObjSuccess) chartObjSuccess.destroy();
-    chartObjSuccess = new Chart(document.getElementById('chartSuccess'), {{
-        type: 'line',
-        data: {{
-            labels: st[`month_labels${{suffix}}`],
-            datasets: [{{
-                label: 'Tasa de Éxito',
-                data: st[`monthly_success${{suffix}}`],
-                borderColor: '#2196F3',
-                backgroundColor: 'rgba(33, 150, 243, 0.1)',
-                tension: 0.4,
-                fill: true
-            }}]
-        }},
-        options: {{
-            responsive: true, maintainAspectRatio: false,
-            plugins: {{ legend: {{ display: false }} }},
-            scales: {{ y: {{ max: 100, min: 0 }} }}
-        }}
-    }});
+function updateMainChart(st, suffix, metric) {{
+    const arrayName = metric === 'amount' ? `monthly_by_status${{suffix}}` : `monthly_count_by_status${{suffix}}`;
+    syncChart('chartMain', {{
+        labels: st[`month_labels${{suffix}}`],
+        datasets: buildStackedDatasets(st, arrayName)
+    }}, false);
+}}
+
+function updateSuccessChart(st, suffix) {{
+    syncChart('chartSuccess', {{
+        labels: st[`month_labels${{suffix}}`],
+        datasets: [{{
+            label: 'Tasa de Éxito',
+            data: st[`monthly_success${{suffix}}`],
+            borderColor: '#2196F3',
+            backgroundColor: 'rgba(33, 150, 243, 0.1)',
+            tension: 0.4,
+            fill: true
+        }}]
+    }}, true);
 }}
 
-const toggleEl = document.getElementById('foughtToggle');
+function updateDonuts(st) {{
+    syncChart('chartStatus', doughnutData(st.status_donut_labels, st.status_donut_values, st.status_donut_colors), true);
+    syncChart('chartType', doughnutData(st.type_donut_labels, st.type_donut_values, st.type_donut_colors), true);
+    syncChart('chartCountry', doughnutData(st.country_donut_labels, st.country_donut_values, st.country_donut_colors), true);
+}}
+
+// Only the parts whose inputs changed since the last render are redrawn
+let lastRenderState = {{}};
+function renderDashboardMode(isFoughtOnly) {{
+    const state = {{
+        key: isFoughtOnly ? 'fought' : 'all',
+        suffix: $.dateChartToggle.value === 'payment' ? '_payment' : '_cb',
+        metric: $.mainChartToggle.value,
+    }};
+    const st = RAW_DATA[state.key];
+    const keyChanged = state.key !== lastRenderState.key;
+    const suffixChanged = state.suffix !== lastRenderState.suffix;
+
+    if (keyChanged) {{
+        updateStatCards(st);
+        updateLists(st);
+        updateDonuts(st);
+    }}
+    if (keyChanged || suffixChanged || state.metric !== lastRenderState.metric) {{
+        updateMainChart(st, state.suffix, state.metric);
+    }}
+    if (keyChanged || suffixChanged) {{
+        updateSuccessChart(st, state.suffix);
+    }}
+    lastRenderState = state;
+}}
+
+const toggleEl = $.foughtToggle;
 toggleEl.addEventListener('change', (e) => {{
     renderDashboardMode(e.target.checked);
 }});
 
-const mainChartToggleEl = document.getElementById('mainChartToggle');
+const mainChartToggleEl = $.mainChartToggle;
 mainChartToggleEl.addEventListener('change', (e) => {{
     // Update the title
     if (e.target.value === 'amount') {{
-        document.getElementById('mainChartTitle').innerText = 'Importe por Mes (MXN)';
+        $.mainChartTitle.innerText = 'Importe por Mes (MXN)';
     }} else {{
-        document.getElementById('mainChartTitle').innerText = 'Cantidad por Mes';
+        $.mainChartTitle.innerText = 'Cantidad por Mes';
     }}
     // Re-render everything to pick up the new toggle value
-    renderDashboardMode(document.getElementById('foughtToggle').checked);
+    renderDashboardMode($.foughtToggle.checked);
 }});
 
-const dateChartToggleEl = document.getElementById('dateChartToggle');
+const dateChartToggleEl = $.dateChartToggle;
 dateChartToggleEl.addEventListener('change', (e) => {{
-    renderDashboardMode(document.getElementById('foughtToggle').checked);
+    renderDashboardMode($.foughtToggle.checked);
 }});
 renderDashboardMode(false);
 </script>
 </body>
 </html>"""
-    return html
+
+
+class _PageSink:
+    """
+    Text sink for write_html(): streams the page into temp copies of
+    ``out_path`` and its precompressed variants while hashing it, then
+    either moves them into place or discards them on close().
+    """
+
+    def __init__(self, out_path: str, now: str):
+        self.paths = [out_path, out_path + ".gz"]
+        self._now = now
+        self._raw = open(out_path + ".tmp", "wb")
+        self._gz_file = open(out_path + ".gz.tmp", "wb")
+        self._gz = gzip.GzipFile(filename="", mode="wb", compresslevel=6,
+                                 fileobj=self._gz_file, mtime=0)
+        self._br = self._br_file = None
+        if brotli is not None:
+            self.paths.append(out_path + ".br")
+            self._br = brotli.Compressor(quality=5)
+            self._br_file = open(out_path + ".br.tmp", "wb")
+        self.digest = hashlib.blake2b()
+
+    def write(self, chunk: str):
+        raw = chunk.encode("utf-8")
+        self._raw.write(raw)
+        self._gz.write(raw)
+        if self._br is not None:
+            self._br_file.write(self._br.process(raw))
+        # The report timestamp changes on every run, so it is left out
+        self.digest.update(chunk.replace(self._now, "").encode("utf-8"))
+
+    def close(self, keep: bool):
+        if self._br is not None:
+            self._br_file.write(self._br.finish())
+            self._br_file.close()
+        self._gz.close()
+        self._gz_file.close()
+        self._raw.close()
+        for path in self.paths:
+            if keep:
+                os.replace(path + ".tmp", path)
+            else:
+                os.remove(path + ".tmp")
 
 
 # ---------------------------------------------------------------------------
 # GitHub Integration
 # ---------------------------------------------------------------------------
-def push_to_github(file_path):
+
+
+def push_to_github(*file_paths) -> bool:
+    """Commit and push ``file_paths``; True once the remote is up to date."""
     print("\n[4/4] Committing to GitHub...")
-    try:
-        # Check if git is available
-        subprocess.run(["git", "--version"], check=True, capture_output=True)
-        
-        # Check if repo exists
-        git_check = subprocess.run(["git", "status"], capture_output=True, text=True)
-        if "not a git repository" in git_check.stderr.lower() or "not recognized" in git_check.stderr.lower():
-            print("      -> WARNING: This folder is not a valid git repository or git is not installed.")
-            return
-
-        # Add the file
-        subprocess.run(["git", "add", file_path], check=True, capture_output=True)
-        
-        # Commit
-        commit_msg = f"Auto-update: Dashboard generated {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        subprocess.run(["git", "commit", "-m", commit_msg], check=True, capture_output=True)
-        
-        # Push
-        print("      -> Pushing to remote repository...")
-        subprocess.run(["git", "push"], check=True, capture_output=True)
+    commit_msg = f"Auto-update: Dashboard generated {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+
+    # add/commit/push run as one shell invocation instead of a process per step.
+    # The commit is skipped when nothing is staged, but the push always runs
+    # so a commit left behind by an earlier failed push still goes out.
+    quote = subprocess.list2cmdline if os.name == "nt" else shlex.join
+    add = quote(["git", "add", *file_paths])
+    nothing_staged = quote(["git", "diff", "--cached", "--quiet"])
+    commit = quote(["git", "commit", "-m", commit_msg])
+    push = quote(["git", "push"])
+    script = f"{add} && ({nothing_staged} || {commit}) && {push}"
+    print("      -> Committing and pushing to remote repository...")
+    result = subprocess.run(script, shell=True, capture_output=True, text=True)
+    output = (result.stdout + result.stderr).lower()
+
+    if result.returncode == 0:
         print("      -> Successfully committed and pushed to GitHub!")
-        
-    except FileNotFoundError:
+        return True
+    elif result.returncode in (127, 9009):  # sh / cmd: command not found
         print("      -> ERROR: Git executable not found on the system pathway.")
-    except subprocess.CalledProcessError as e:
-        # Check if there was simply nothing to commit
-        if "nothing to commit" in getattr(e, 'stdout', b'').decode('utf-8').lower() or \
-           "nothing to commit" in getattr(e, 'stderr', b'').decode('utf-8').lower():
-            print("      -> No changes detected in the dashboard HTML. Skipping commit.")
-        else:
-            print(f"      -> ERROR during Git operations: {e}")
+    elif "not a git repository" in output:
+        print("      -> WARNING: This folder is not a valid git repository or git is not installed.")
+    else:
+        print(f"      -> ERROR during Git operations: {result.stderr.strip()}")
+    return False
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
+def _write_state(path: str, value: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(value)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate the chargeback dashboard.")
+    parser.add_argument("--refresh", action="store_true",
+                        help=f"rebuild {SNAPSHOT_TABLE} before generating")
+    parser.add_argument("--force", action="store_true",
+                        help="regenerate even if the source data is unchanged")
+    args = parser.parse_args()
+
+    out_path = os.path.join(os.path.dirname(__file__), "dashboard_output.html")
+    fingerprint_path = out_path + ".fp"
+    digest_path = out_path + ".b2"
+
+    if args.refresh:
+        print(f"[0/3] Refreshing {SNAPSHOT_TABLE}...")
+        refresh_snapshot()
+
+    fingerprint = fetch_fingerprint()
+    if not args.force and os.path.exists(out_path) and os.path.exists(fingerprint_path):
+        with open(fingerprint_path, encoding="utf-8") as f:
+            if f.read() == fingerprint:
+                print("Source data unchanged since the last run. Nothing to do.")
+                return
+
     print("[1/3] Fetching data from database...")
     df = fetch_data()
     print(f"      -> {len(df)} chargeback records loaded.")
@@ -1549,17 +2006,36 @@ def main():
     data = process_data(df)
 
     print("[3/3] Generating HTML dashboard...")
-    html = generate_html(data)
-
-    out_path = os.path.join(os.path.dirname(__file__), "dashboard_output.html")
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(html)
+    now = datetime.now().strftime("%d/%m/%Y %H:%M")
+    sink = _PageSink(out_path, now)
+    try:
+        write_html(data, sink, now)
+    except BaseException:
+        sink.close(keep=False)
+        raise
+
+    # An unchanged page (ignoring its timestamp) is neither kept nor pushed
+    digest = sink.digest.hexdigest()
+    unchanged = False
+    if not args.force and os.path.exists(out_path) and os.path.exists(digest_path):
+        with open(digest_path, encoding="utf-8") as f:
+            unchanged = f.read() == digest
+    sink.close(keep=not unchanged)
+
+    if unchanged:
+        print("Dashboard content unchanged. Skipping write and push.")
+        _write_state(fingerprint_path, fingerprint)
+        return
 
     print(f"DONE! Dashboard saved to: {out_path}")
     print("      Open the file in your browser to view the dashboard.")
 
-    # Automate github submission
-    push_to_github(out_path)
+    # Automate github submission. Only the HTML is versioned; the compressed
+    # copies are for serving. Digest and fingerprint are only recorded once
+    # the push went through, so a failed push is retried on the next run.
+    if push_to_github(out_path):
+        _write_state(digest_path, digest)
+        _write_state(fingerprint_path, fingerprint)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+-- Indexes backing the queries in generate_dashboard.py.
+-- Run on the primary; the changes replicate to live-replica.
+--
+-- Every step is guarded by an information_schema check (MySQL has no
+-- ADD INDEX IF NOT EXISTS), so the file can be re-run after a partial
+-- failure. Each ALTER names its ALGORITHM/LOCK: if the server cannot honour
+-- them it fails immediately instead of silently blocking writes.
+--
+-- Cost: no step rebuilds a table. The index builds in steps 1, 2 and 4
+-- still scan their whole table, and step 3 computes LEFT(credit_card, 6)
+-- for every row of fraud.cb_payments. Concurrent reads and writes keep
+-- working, but run this off-peak and watch replica lag.
+-- generate_dashboard.py detects cbs.card_first_6 and keeps joining on
+-- LEFT(credit_card, 6) until step 3 has run.
+
+
+-- 1. WHERE cbs.rechargeApi = 9 AND cbs.created_at > CURDATE() - INTERVAL 6 MONTH
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = 'fraud' AND table_name = 'cb_payments'
+       AND index_name = 'ix_cbs_api_created') = 0,
+    'ALTER TABLE fraud.cb_payments
+        ADD INDEX ix_cbs_api_created (rechargeApi, created_at),
+        ALGORITHM=INPLACE, LOCK=NONE',
+    'DO 0');
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;
+
+
+-- 2. LEFT JOIN fraud.fought_cbs_followup ON cbs.id = fcbs.payment_id
+-- MySQL has no INCLUDE clause, so the selected columns are appended to
+-- make the index covering.
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = 'fraud' AND table_name = 'fought_cbs_followup'
+       AND index_name = 'ix_fcbs_payment') = 0,
+    'ALTER TABLE fraud.fought_cbs_followup
+        ADD INDEX ix_fcbs_payment (payment_id, sift_id, status, created_at, result_date),
+        ALGORITHM=INPLACE, LOCK=NONE',
+    'DO 0');
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;
+
+
+-- 3. The binlist join used LEFT(cbs.credit_card, 6), which no index can
+-- serve. A VIRTUAL generated column is a metadata-only change (a STORED
+-- one would force a full copy-rebuild of cb_payments). The secondary
+-- index then materialises the values online.
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.columns
+     WHERE table_schema = 'fraud' AND table_name = 'cb_payments'
+       AND column_name = 'card_first_6') = 0,
+    'ALTER TABLE fraud.cb_payments
+        ADD COLUMN card_first_6 CHAR(6) AS (LEFT(credit_card, 6)) VIRTUAL,
+        ALGORITHM=INPLACE, LOCK=NONE',
+    'DO 0');
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;
+
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = 'fraud' AND table_name = 'cb_payments'
+       AND index_name = 'ix_cbs_card_first_6') = 0,
+    'ALTER TABLE fraud.cb_payments
+        ADD INDEX ix_cbs_card_first_6 (card_first_6),
+        ALGORITHM=INPLACE, LOCK=NONE',
+    'DO 0');
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;
+
+
+-- 4. Lookup side of the same join. Skipped when any index, the primary
+-- key included, already leads with card_first_6.
+SET @ddl = IF(
+    (SELECT COUNT(*) FROM information_schema.statistics
+     WHERE table_schema = 'saldogra_gamma' AND table_name = 'binlist'
+       AND column_name = 'card_first_6' AND seq_in_index = 1) = 0,
+    'ALTER TABLE saldogra_gamma.binlist
+        ADD INDEX ix_bl_card_first_6 (card_first_6),
+        ALGORITHM=INPLACE, LOCK=NONE',
+    'DO 0');
+PREPARE stmt FROM @ddl; EXECUTE stmt; DEALLOCATE PREPARE stmt;